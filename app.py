@@ -1,11 +1,44 @@
+import atexit
 import os
+import queue
 import re
+import shutil
 import subprocess
+import tempfile
+import threading
+import timeit
+import uuid
+import zipfile
+from bisect import bisect_right
+from contextlib import suppress
 from datetime import datetime
-from flask import Flask, render_template, request, send_from_directory, flash, jsonify
+from io import BytesIO
+from itertools import zip_longest
+from pathlib import Path
+from flask import Flask, render_template, request, send_from_directory, jsonify, abort
+from werkzeug.security import safe_join
 from docx import Document
+from docx.oxml import parse_xml
 from docx.text.paragraph import Paragraph
-from copy import deepcopy
+from copy import copy, deepcopy
+from lxml import etree
+import ahocorasick
+
+try:  # python-uno ships with LibreOffice; optional
+    import uno
+    from com.sun.star.beans import PropertyValue
+except ImportError:
+    uno = None
+
+# Imported once here (not per conversion) so a preloading server shares it across workers
+try:  # needs Microsoft Word at conversion time; optional
+    from docx2pdf import convert as _docx2pdf_convert
+except Exception:
+    _docx2pdf_convert = None
+try:  # pywin32, Windows only
+    import pythoncom
+except ImportError:
+    pythoncom = None
 
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
@@ -16,6 +49,38 @@ INSTANCE_DIR = os.path.join(BASE_DIR, "instance")
 os.makedirs(GENERATED_DIR, exist_ok=True)
 os.makedirs(INSTANCE_DIR, exist_ok=True)
 
+CV_TPL_PATH = os.path.join(DOCX_TPL_DIR, "CV_template.docx")
+CL_TPL_PATH = os.path.join(DOCX_TPL_DIR, "Cover_letter_template.docx")
+
+# Every placeholder each template uses (keys of cv_map + exp_map / cl_map below)
+CV_PLACEHOLDERS = (
+    "[Name]", "[Physical Address]", "[Phone Number]", "[Email Address]",
+    "[University Name]", "[City]", "[State/Country]", "[Arts/Science]", "[Major]",
+    "[Graduation Date]", "[GPA]", "[SAT]",
+    "[If you’re outside the US, list grades under your system here instead]",
+    "[Honors]", "[Economics / Accounting / Finance classes, anything business-related]",
+    "[Fluent]", "[Conversational]", "[List any programming languages – not MS Office/Excel]",
+    "[Any extra courses or programs relevant to finance]",
+    "[Student Clubs, Volunteer Work, Independent Activities]",
+    "[Keep this to 1-2 lines and be specific; do not go overboard]",
+    "[Company Name]", "[Position Title], [Group Name]", "[Start Date]", "[End Date]",
+    "[Experience Description]",
+)
+CL_PLACEHOLDERS = (
+    "[Your Name]", "[Your Address]", "[Your Phone Number]", "[Your Email Address]", "[Date]",
+    "[Name of Recruiter]", "[Title]", "[Name of Bank]", "[Recruiter’s Address]", "[Mr. / Ms.]",
+    "[Recruiter’s Name]", "[Year]", "[School Name]", "[Major]",
+    "[Friend / Contact at Firm / Presentation]",
+    "[Your Culture / Working Environment / Bank-Specific Info.]",
+    "[Investment Banking Analyst / Associate]",
+    "[Completed Internships In… / Worked Full-Time In…]",
+    "[Working on Transactions / Leading Teams and Managing Projects / Performing Quantitative Analysis]",
+    "[Go Into Anything Relevant to Banking, Such As Analytical / Leadership / Teamwork / Finance / Accounting]",
+    "[Any Other Relevant Skills]", "[High-Impact Project]", "[Describe Results]",
+    "[Summarize Internships / Work Experience]", "[Summarize Skills]", "[Position Name]",
+    "[Transactions / Clients]", "[Firm Name]", "[Phone Number]", "[Email Address]", "[Signature]",
+)
+
 app = Flask(
     __name__,
     template_folder=TEMPLATES_DIR,
@@ -25,19 +90,55 @@ app = Flask(
 )
 app.secret_key = "dev-secret-key"
 
+_SANI_STRIP = re.compile(r"[^\w\s\-\.]", re.U)
+_SANI_WS = re.compile(r"\s+")
+_DOCX2PDF_LOCK = threading.Lock()
+
+SOFFICE_PORT = 2002
+_soffice_proc = None
+_soffice_pid = None  # process that launched _soffice_proc; poll() is only valid there
+_uno_desktop = None
+_UNO_LOCK = threading.Lock()
+
+PDF_WORKERS = 2
+_pdf_queue = None
+_pdf_workers_pid = None
+_PDF_WORKERS_LOCK = threading.Lock()
+_PDF_JOBS_LOCK = threading.Lock()  # orders job claims against result publishing
+
+W_NS = {"w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main"}
+# Same run selection and text equivalents as python-docx's Paragraph.runs / CT_R.text,
+# compiled once instead of going through Run wrappers for every access.
+_R_XPATH = etree.XPath("./w:r", namespaces=W_NS)
+_P_STRING_XPATH = etree.XPath("string(.)")
+# Experience block detection straight on <w:body> (doc.paragraphs == its w:p children)
+_BODY_P_XPATH = etree.XPath("./w:p", namespaces=W_NS)
+_EXP_START_XPATH = etree.XPath(
+    "./w:p[contains(string(.), '[Company Name]')][1]", namespaces=W_NS
+)
+_EXP_END_XPATH = etree.XPath(
+    "following-sibling::w:p[contains(string(.), 'SKILLS, ACTIVITIES & INTERESTS')][1]",
+    namespaces=W_NS,
+)
+_P_INDEX_XPATH = etree.XPath("count(preceding-sibling::w:p)", namespaces=W_NS)
+_P_COUNT_XPATH = etree.XPath("count(./w:p)", namespaces=W_NS)
+# The paragraphs replace_in_doc_preserve visits: body paragraphs, then table cells
+_DOC_P_XPATH = etree.XPath("w:body/w:p | w:body/w:tbl/w:tr/w:tc/w:p", namespaces=W_NS)
+_R_CONTENT_XPATH = etree.XPath(
+    "w:br | w:cr | w:noBreakHyphen | w:ptab | w:t | w:tab", namespaces=W_NS
+)
+
 
 # ----------------- helpers -----------------
 def sanitize_filename(name: str) -> str:
-    name = re.sub(r"[^\w\s\-\.]", "", name, flags=re.U)
-    name = re.sub(r"\s+", "_", name).strip("_")
+    name = _SANI_WS.sub("_", _SANI_STRIP.sub("", name)).strip("_")
     return name or "Document"
 
 def pack_repeating(prefix: str, fields: list[str]) -> list[dict]:
-    lists = {f: request.form.getlist(f"{prefix}_{f}[]") for f in fields}
-    length = max((len(v) for v in lists.values()), default=0)
+    lists = [request.form.getlist(f"{prefix}_{f}[]") for f in fields]
     items = []
-    for i in range(length):
-        item = {f: (lists[f][i].strip() if i < len(lists[f]) else "") for f in fields}
+    for row in zip_longest(*lists, fillvalue=""):
+        item = {f: v.strip() for f, v in zip(fields, row)}
         if any(item.values()):
             items.append(item)
     return items
@@ -54,144 +155,254 @@ def compose_state_country(state: str, country: str) -> str:
         return f"{s}, {c}"
     return s or c
 
-def replace_in_runs_preserve(paragraph, mapping: dict):
-    runs = paragraph.runs
-    if not runs:
-        return
-
-    # 0) Normalize replacement values first
-    def _norm(s: str) -> str:
-        if s is None:
-            return ""
-        # normalize CRLF and CR to LF
-        return str(s).replace("\r\n", "\n").replace("\r", "\n")
-
-    norm_mapping = {k: _norm(v) for k, v in mapping.items()}
-
-    # 1) Build full string and index map: full_char_idx -> (run_idx, offset_in_run)
-    run_texts = [r.text or "" for r in runs]
-    index_map = []
-    full_pieces = []
-    for ri, t in enumerate(run_texts):
-        full_pieces.append(t)
-        index_map.extend((ri, oi) for oi in range(len(t)))
-    full_text = "".join(full_pieces)
-    if not full_text:
-        return
+def _norm(s: str) -> str:
+    if s is None:
+        return ""
+    s = str(s)
+    if "\r" not in s:  # common case: nothing to normalize
+        return s
+    # normalize CRLF and CR to LF
+    return s.replace("\r\n", "\n").replace("\r", "\n")
 
-    # 2) Find non-overlapping matches (longest keys first)
-    keys = sorted(norm_mapping.keys(), key=len, reverse=True)
-    occupied = [False] * len(full_text)
-    matches = []  # (start, end, replacement)
+def normalize_mapping(mapping: dict) -> dict:
+    return {k: _norm(v) for k, v in mapping.items()}
 
+def _partial_overlaps(keys) -> list:
+    """
+    Pairs (a, b) where a suffix of `a` is a prefix of `b` without either key
+    containing the other, e.g. "[A], [B]" and "[B], [C]".
+    """
+    keys = [k for k in set(keys) if k]
+    return [
+        (a, b)
+        for a in keys for b in keys
+        if a != b and a not in b and b not in a
+        and any(a.endswith(b[:n]) for n in range(1, min(len(a), len(b))))
+    ]
+
+def build_automaton(keys):
+    """
+    Compile placeholder `keys` into one Aho-Corasick automaton.
+    Each key carries (key_len, key); values are looked up per request.
+    Keys may contain one another but must not partly overlap (see _select_matches).
+    """
+    overlaps = _partial_overlaps(keys)
+    if overlaps:
+        raise ValueError(f"placeholders overlap without containment: {overlaps}")
+    automaton = ahocorasick.Automaton()
     for k in keys:
-        if not k:
+        if k:
+            automaton.add_word(k, (len(k), k))
+    if automaton.kind == ahocorasick.EMPTY:
+        raise ValueError("build_automaton needs at least one non-empty placeholder key")
+    automaton.make_automaton()
+    return automaton
+
+# One shared automaton per template, built at import and reused by every request
+_CV_AC = build_automaton(CV_PLACEHOLDERS)
+_CL_AC = build_automaton(CL_PLACEHOLDERS)
+
+def _run_text(r) -> str:
+    return "".join(str(e) for e in _R_CONTENT_XPATH(r))
+
+def _select_matches(automaton, text: str) -> list:
+    """
+    Non-overlapping placeholder matches in `text`, leftmost-longest: [(start, end, key)].
+    Selection happens inside pyahocorasick's C scan (iter_long). build_automaton
+    rejects keys that overlap without one containing the other, so this is the
+    same as taking the longest keys first.
+    """
+    return [
+        (end_idx - klen + 1, end_idx + 1, key)
+        for end_idx, (klen, key) in automaton.iter_long(text)
+    ]
+
+def merge_placeholder_runs(p, automaton):
+    """
+    Word often splits a placeholder over several runs (spell-check, revisions).
+    Move each placeholder's text into the run where it starts, dropping the runs
+    it swallows, so replacement never has to cross runs. As with a cross-run
+    replacement, the placeholder takes the first run's formatting and any text
+    after it stays in the last run.
+    """
+    if "[" not in _P_STRING_XPATH(p):
+        return
+    runs = _R_XPATH(p)
+    if not runs:
+        return
+
+    # run_starts[i] = offset of run i in the paragraph text
+    run_texts = [_run_text(r) for r in runs]
+    run_starts = [0]
+    acc = 0
+    for t in run_texts:
+        acc += len(t)
+        run_starts.append(acc)
+
+    out = list(run_texts)
+    dropped = set()
+    # right-to-left, so a run's leading offsets stay valid while its tail grows
+    for start, end, _ in sorted(_select_matches(automaton, "".join(run_texts)), reverse=True):
+        ri = bisect_right(run_starts, start) - 1
+        rj = bisect_right(run_starts, end - 1) - 1
+        if ri == rj:
             continue
-        klen = len(k)
-        start = 0
-        repl = norm_mapping[k]
-        while True:
-            pos = full_text.find(k, start)
-            if pos == -1:
-                break
-            end = pos + klen
-            if any(occupied[pos:end]):
-                start = pos + 1
-                continue
-            matches.append((pos, end, repl))
-            for i in range(pos, end):
-                occupied[i] = True
-            start = end  # continue after this match
-
-    if not matches:
+        oj = (end - 1) - run_starts[rj]
+        out[ri] += "".join(out[ri + 1:rj]) + out[rj][:oj + 1]
+        out[rj] = out[rj][oj + 1:]
+        dropped.update(range(ri + 1, rj))
+        if not out[rj]:
+            dropped.add(rj)
+
+    for i, (r, old, new) in enumerate(zip(runs, run_texts, out)):
+        if i in dropped:
+            p.remove(r)
+        elif new != old:
+            r.text = new
+
+def replace_in_runs_preserve(paragraph, automaton, mapping: dict):
+    replace_in_p_element(paragraph._p, automaton, mapping)
+
+def replace_in_p_element(p, automaton, mapping: dict):
+    """
+    Placeholder replacement on a bare CT_P element, run by run: templates are
+    passed through merge_placeholder_runs first, so no placeholder spans runs.
+    `automaton` finds the placeholders; `mapping` (already normalized) supplies
+    their values. Placeholders missing from `mapping` are left as they are.
+    """
+    # Fast path: every template placeholder is bracketed, so a paragraph whose
+    # XML text has no "[" (most of them) needs no run-level work at all.
+    if "[" not in _P_STRING_XPATH(p):
         return
+    for r in _R_XPATH(p):  # CT_R elements; writes go through CT_R.text
+        text = _run_text(r)
+        if "[" not in text:
+            continue
+        matches = [m for m in _select_matches(automaton, text) if m[2] in mapping]
+        if not matches:
+            continue
+        # apply right-to-left so earlier offsets stay valid; one write per run
+        for start, end, key in reversed(matches):
+            text = text[:start] + mapping[key] + text[end:]
+        r.text = text
 
-    # 3) Apply matches right-to-left
-    for start, end, repl in sorted(matches, key=lambda x: x[0], reverse=True):
-        ri, oi = index_map[start]
-        rj, oj = index_map[end - 1]
+def check_placeholder_catalog(automaton, mapping: dict):
+    """
+    Fail on drift between a mapping and the catalog its automaton was built from:
+    a key missing from the catalog would silently never be merged or replaced.
+    """
+    missing = [k for k in mapping if k not in automaton]
+    if missing:
+        raise ValueError(f"placeholders missing from the catalog: {missing}")
 
-        if ri == rj:
-            # single-run replacement
-            t = runs[ri].text
-            runs[ri].text = t[:oi] + repl + t[oj + 1:]
-        else:
-            # span multiple runs:
-            # first run = prefix + replacement
-            # middle runs = cleared
-            # last run = suffix
-            t_first = runs[ri].text
-            t_last = runs[rj].text
-
-            runs[ri].text = t_first[:oi] + repl
-            for m in range(ri + 1, rj):
-                runs[m].text = ""
-            runs[rj].text = t_last[oj + 1:]
-
-def replace_in_doc_preserve(doc: Document, mapping: dict):
+def replace_in_doc_preserve(doc: Document, automaton, mapping: dict, overrides: dict = None):
+    """
+    Single replacement pass over body and table paragraphs.
+    `overrides` maps a paragraph's CT_P element to the normalized mapping to use
+    for it instead of `mapping` (e.g. cloned experience blocks).
+    """
+    overrides = overrides or {}
+    for m in (mapping, *overrides.values()):
+        check_placeholder_catalog(automaton, m)
+    mapping = normalize_mapping(mapping)
     for p in doc.paragraphs:
-        replace_in_runs_preserve(p, mapping)
+        replace_in_runs_preserve(p, automaton, overrides.get(p._element, mapping))
     for tbl in doc.tables:
         for row in tbl.rows:
             for cell in row.cells:
                 for p in cell.paragraphs:
-                    replace_in_runs_preserve(p, mapping)
+                    replace_in_runs_preserve(p, automaton, overrides.get(p._element, mapping))
+
+
+def _rewrite_document_xml(template_bytes: bytes, transform, output):
+    """
+    Copy a .docx zip to `output` (path or file object), passing every paragraph
+    of word/document.xml that replace_in_doc_preserve would visit through
+    `transform`. Only that part is parsed (with the oxml parser, so runs keep
+    CT_R semantics); every other zip entry is copied through untouched.
+    """
+    with zipfile.ZipFile(BytesIO(template_bytes)) as zin, \
+            zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as zout:
+        for item in zin.infolist():
+            data = zin.read(item.filename)
+            if item.filename == "word/document.xml":
+                root = parse_xml(data)
+                for p in _DOC_P_XPATH(root):
+                    transform(p)
+                data = etree.tostring(root, encoding="UTF-8", standalone=True)
+            zout.writestr(item, data)
+
+def fill_docx_template(template_bytes: bytes, automaton, mapping: dict, output_docx: str):
+    """Placeholder-only fill that skips python-docx's package model."""
+    check_placeholder_catalog(automaton, mapping)
+    mapping = normalize_mapping(mapping)
+    _rewrite_document_xml(
+        template_bytes, lambda p: replace_in_p_element(p, automaton, mapping), output_docx
+    )
+
+def load_template(path: str, automaton) -> bytes:
+    """Read a template once, with every placeholder merged into a single run."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    buf = BytesIO()
+    _rewrite_document_xml(raw, lambda p: merge_placeholder_runs(p, automaton), buf)
+    return buf.getvalue()
+
+# Template bytes are read (and run-merged) once; each request parses its own copy from memory.
+_CV_TPL_BYTES = load_template(CV_TPL_PATH, _CV_AC)
+_CL_TPL_BYTES = load_template(CL_TPL_PATH, _CL_AC)
 
 
 # ------------- experience templating (clone with formatting) -------------
-def copy_paragraph_with_replacements(before_paragraph, src_paragraph, mapping: dict):
+def clone_paragraph_before(before_paragraph, src_ctp):
     """
-    Insert a deep-copied clone of `src_paragraph` *before* `before_paragraph`.
-    Then apply cross-run replacement with CR normalized.
+    Insert a deep-copied clone of the CT_P element `src_ctp` *before* `before_paragraph`.
     Returns the new Paragraph.
     """
     # clone the underlying CT_P (XML element)
-    new_ctp = deepcopy(src_paragraph._element)
+    new_ctp = _clone_element(src_ctp)
     # insert into document tree
     before_paragraph._element.addprevious(new_ctp)
     # wrap as a python-docx Paragraph object
-    new_p = Paragraph(new_ctp, before_paragraph._parent)
-
-    # apply cross-run replacer (with CR normalization inside)
-    replace_in_runs_preserve(new_p, mapping)
-    return new_p
+    return Paragraph(new_ctp, before_paragraph._parent)
 
-def find_first_experience_block(doc: Document):
+def find_first_experience_block(body):
     """
-    Find the first experience block as the sequence of paragraphs
+    Find the first experience block among the w:p children of `body` (<w:body>)
+    as the sequence of paragraphs
     starting from the first paragraph containing '[Company Name]'
     until just before 'SKILLS, ACTIVITIES & INTERESTS' or end-of-doc.
-    Return (start_idx, end_idx_exclusive). None,None if not found.
+    Return (start_idx, end_idx_exclusive), indices as in doc.paragraphs.
+    None,None if not found.
     """
-    paras = doc.paragraphs
-    start = None
-    for i, p in enumerate(paras):
-        if "[Company Name]" in p.text:
-            start = i
-            break
-    if start is None:
+    found = _EXP_START_XPATH(body)
+    if not found:
         return None, None
-    end = len(paras)
-    for j in range(start + 1, len(paras)):
-        if "SKILLS, ACTIVITIES & INTERESTS" in paras[j].text:
-            end = j
-            break
+    start = int(_P_INDEX_XPATH(found[0]))
+    found = _EXP_END_XPATH(found[0])
+    end = int(_P_INDEX_XPATH(found[0]) if found else _P_COUNT_XPATH(body))
     return start, end
 
-def materialize_experiences(doc: Document, experiences: list[dict]):
+def materialize_experiences(doc: Document, experiences: list[dict], base_mapping: dict) -> dict:
     """
-    Fill the first experience block with experiences[0];
+    Keep the first experience block for experiences[0];
     For experiences[1:], clone the original block after its end,
     preserving formatting and inserting a blank line between blocks.
+    No text is replaced here: returns {CT_P: mapping} for every block paragraph,
+    `base_mapping` overlaid with that experience's placeholders (normalized),
+    to be passed as `overrides` to replace_in_doc_preserve.
     """
     if not experiences:
-        return
-    start, end = find_first_experience_block(doc)
+        return {}
+    body = doc.element.body
+    start, end = find_first_experience_block(body)
     if start is None:
-        return
+        return {}
 
-    # Capture ORIGINAL block paragraphs to clone from
-    block_paras = doc.paragraphs[start:end]
+    # ORIGINAL block paragraphs to clone from (left untouched until the replace pass)
+    p_elems = _BODY_P_XPATH(body)
+    block_ctps = p_elems[start:end]
+    block_style = Paragraph(p_elems[end - 1], doc._body).style
 
     # Build a function that maps one experience to placeholder mapping
     def exp_map(e):
@@ -207,24 +418,245 @@ def materialize_experiences(doc: Document, experiences: list[dict]):
             "[End Date]": e.get("end", ""),
             "[Experience Description]": e.get("summary", ""),
         }
-        return mapping
+        return {**base_mapping, **mapping}
 
-    block_paras_bak = deepcopy(block_paras)
-    # (1) Fill the FIRST block in place (preserve run formatting)
-    first_mapping = exp_map(experiences[0])
-    for p in block_paras:
-        replace_in_runs_preserve(p, first_mapping)
+    # (1) The FIRST block is filled in place
+    first_mapping = normalize_mapping(exp_map(experiences[0]))
+    per_paragraph = {ctp: first_mapping for ctp in block_ctps}
 
-    # (2) For remaining experiences, clone block with mapping
-    insert_before = doc.paragraphs[end]
+    # (2) For remaining experiences, clone the block and tag the clones
+    insert_before = Paragraph(p_elems[end], doc._body)
     for e in experiences[1:]:
-        # clone each paragraph in original block (not the modified one)
-        for src_p in block_paras_bak:
-            copy_paragraph_with_replacements(insert_before, src_p, exp_map(e))
+        mapping = normalize_mapping(exp_map(e))
+        for src_ctp in block_ctps:
+            new_p = clone_paragraph_before(insert_before, src_ctp)
+            per_paragraph[new_p._element] = mapping
 
         # insert a blank paragraph between experiences
         insert_before = insert_before.insert_paragraph_before("")
-        insert_before.style = block_paras_bak[-1].style
+        insert_before.style = block_style
+    return per_paragraph
+
+def _clone_reparse(elem):
+    # parse_xml (not etree.fromstring) so the clone keeps python-docx's CT_* classes
+    return parse_xml(etree.tostring(elem))
+
+# All three yield a full CT_P subtree copy; lxml implements copy/deepcopy in C.
+_CLONE_CANDIDATES = (deepcopy, copy, _clone_reparse)
+
+def _pick_clone_element():
+    """Time each way of cloning the CV template's experience block once; keep the fastest."""
+    body = Document(BytesIO(_CV_TPL_BYTES)).element.body
+    start, end = find_first_experience_block(body)
+    if start is None:
+        return deepcopy
+    sample = _BODY_P_XPATH(body)[start:end]
+    return min(
+        _CLONE_CANDIDATES,
+        key=lambda fn: min(timeit.repeat(lambda: [fn(p) for p in sample], number=20, repeat=3)),
+    )
+
+_clone_element = _pick_clone_element()
+
+
+# ----------------- PDF export -----------------
+def try_docx2pdf(input_docx: str, output_pdf: str) -> bool:
+    if _docx2pdf_convert is None:
+        return False
+    try:
+        # Word automation drives a single application instance: one at a time.
+        with _DOCX2PDF_LOCK:
+            if pythoncom is not None:
+                pythoncom.CoInitialize()  # COM must be initialised per worker thread
+            _docx2pdf_convert(input_docx, output_pdf)
+        return os.path.exists(output_pdf)
+    except Exception:
+        return False
+
+def try_libreoffice(input_docx: str, output_pdf: str) -> bool:
+    try:
+        outdir = os.path.dirname(output_pdf)
+        os.makedirs(outdir, exist_ok=True)
+        # a private profile per worker thread, so concurrent soffice runs don't lock each other out
+        profile = os.path.join(tempfile.gettempdir(), f"lo_{os.getpid()}_{threading.get_ident()}")
+        subprocess.run(
+            ["soffice", f"-env:UserInstallation={Path(profile).as_uri()}",
+             "--headless", "--convert-to", "pdf", "--outdir", outdir, input_docx],
+            check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+        return os.path.exists(output_pdf)
+    except Exception:
+        return False
+
+def start_soffice_server():
+    """
+    Launch a headless LibreOffice listening for UNO connections, so conversions
+    reuse it instead of cold-starting soffice each time. Terminated at exit.
+    Called at import and again by any process that cannot reach the server
+    (e.g. a forked worker after the launching process went away); skipped if
+    this process already runs a live one.
+    """
+    global _soffice_proc, _soffice_pid
+    if uno is None or not shutil.which("soffice"):
+        return
+    if _soffice_pid == os.getpid() and _soffice_proc.poll() is None:
+        return
+    try:
+        _soffice_proc = subprocess.Popen(
+            ["soffice", "--headless", "--nologo", "--norestore",
+             f"--accept=socket,host=127.0.0.1,port={SOFFICE_PORT};urp;"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+    except OSError:
+        return
+    _soffice_pid = os.getpid()
+    atexit.register(_soffice_proc.terminate)
+
+def _uno_props(**kwargs) -> tuple:
+    props = []
+    for name, value in kwargs.items():
+        p = PropertyValue()
+        p.Name, p.Value = name, value
+        props.append(p)
+    return tuple(props)
+
+def _get_uno_desktop():
+    global _uno_desktop
+    if _uno_desktop is None:
+        local = uno.getComponentContext()
+        resolver = local.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local
+        )
+        ctx = resolver.resolve(
+            f"uno:socket,host=127.0.0.1,port={SOFFICE_PORT};urp;StarOffice.ComponentContext"
+        )
+        _uno_desktop = ctx.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", ctx)
+    return _uno_desktop
+
+def convert_via_uno(input_docx: str, output_pdf: str) -> bool:
+    global _uno_desktop
+    if uno is None:
+        return False
+    try:
+        with _UNO_LOCK:
+            try:
+                desktop = _get_uno_desktop()
+            except Exception:
+                start_soffice_server()  # unreachable: (re)launch it for later conversions
+                raise
+            doc = desktop.loadComponentFromURL(
+                uno.systemPathToFileUrl(os.path.abspath(input_docx)), "_blank", 0,
+                _uno_props(Hidden=True)
+            )
+            try:
+                doc.storeToURL(
+                    uno.systemPathToFileUrl(os.path.abspath(output_pdf)),
+                    _uno_props(FilterName="writer_pdf_Export")
+                )
+            finally:
+                doc.close(True)
+        return os.path.exists(output_pdf)
+    except Exception:
+        _uno_desktop = None  # server still booting or gone: reconnect next time
+        return False
+
+def convert_one(input_docx: str, output_pdf: str) -> bool:
+    return (
+        try_docx2pdf(input_docx, output_pdf)
+        or convert_via_uno(input_docx, output_pdf)
+        or try_libreoffice(input_docx, output_pdf)
+    )
+
+# Conversion status lives on disk so any server process can answer /pdfstatus:
+# ready = the PDF exists, failed = a "<pdf>.failed" marker exists, else pending.
+# "<pdf>.job" holds the token of the newest conversion queued for that path, so
+# a superseded job never publishes its result over a newer request's.
+def _pdf_failed_marker(output_pdf: str) -> str:
+    return output_pdf + ".failed"
+
+def _pdf_job_file(output_pdf: str) -> str:
+    return output_pdf + ".job"
+
+def _is_current_pdf_job(output_pdf: str, token: str) -> bool:
+    try:
+        with open(_pdf_job_file(output_pdf)) as f:
+            return f.read() == token
+    except OSError:
+        return False
+
+def _convert_pdf_job(input_docx: str, output_pdf: str, token: str):
+    """
+    Convert into a private temp dir next to `output_pdf`, then os.replace the
+    result into place, so /pdfstatus never reports a half-written PDF as ready.
+    The result (or failure marker) is only published if `token` is still the
+    newest job for `output_pdf`.
+    """
+    tmp_dir = tempfile.mkdtemp(prefix=".pdf_", dir=os.path.dirname(output_pdf))
+    try:
+        # same file name, so soffice --convert-to (named after the DOCX) lands on it too
+        tmp_pdf = os.path.join(tmp_dir, os.path.basename(output_pdf))
+        try:
+            ok = convert_one(input_docx, tmp_pdf)
+        except Exception:  # never let one job kill the thread
+            ok = False
+        with _PDF_JOBS_LOCK:
+            if not _is_current_pdf_job(output_pdf, token):
+                return
+            if ok:
+                try:
+                    os.replace(tmp_pdf, output_pdf)
+                    return
+                except OSError:  # e.g. Windows: the old PDF is still open
+                    pass
+            try:
+                open(_pdf_failed_marker(output_pdf), "w").close()
+            except OSError:
+                pass
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+def _pdf_worker(q):
+    while True:
+        job = q.get()
+        try:
+            _convert_pdf_job(*job)
+        except Exception:  # e.g. temp dir creation failed: no result to publish
+            pass
+        q.task_done()
+
+def start_pdf_workers():
+    """
+    Start this process's conversion threads. Threads don't survive a fork
+    (e.g. gunicorn --preload), so a forked worker starts its own on first use.
+    """
+    global _pdf_queue, _pdf_workers_pid
+    with _PDF_WORKERS_LOCK:
+        if _pdf_workers_pid == os.getpid():
+            return
+        _pdf_workers_pid = os.getpid()
+        _pdf_queue = queue.Queue()
+        for _ in range(PDF_WORKERS):
+            threading.Thread(target=_pdf_worker, args=(_pdf_queue,), daemon=True).start()
+
+def enqueue_pdf(input_docx: str, output_pdf: str):
+    """Queue a DOCX->PDF conversion for the background workers."""
+    start_pdf_workers()
+    token = uuid.uuid4().hex
+    with _PDF_JOBS_LOCK:
+        # claim the path first, so an older job still running can't publish into it
+        tmp_job = f"{_pdf_job_file(output_pdf)}.{token}"
+        with open(tmp_job, "w") as f:
+            f.write(token)
+        os.replace(tmp_job, _pdf_job_file(output_pdf))
+        # clear the previous result so status reflects this conversion
+        # (a concurrent request may have removed it already; on Windows an open PDF can't be)
+        for stale in (output_pdf, _pdf_failed_marker(output_pdf)):
+            with suppress(FileNotFoundError, PermissionError):
+                os.remove(stale)
+    _pdf_queue.put((input_docx, output_pdf, token))
+
+start_soffice_server()
+start_pdf_workers()
 
 def build_documents_from_form(request):
     first_name = request.form.get("first_name","").strip()
@@ -282,10 +714,7 @@ def build_documents_from_form(request):
     signature          = request.form.get("signature","").strip()
 
     # ---------- CV ----------
-    cv_doc = Document(os.path.join(DOCX_TPL_DIR, "CV_template.docx"))
-
-    # experiences first (block cloning with preserved formatting)
-    materialize_experiences(cv_doc, experiences)
+    cv_doc = Document(BytesIO(_CV_TPL_BYTES))
 
     # header + education simple replacements (run-preserving)
     cv_map = {
@@ -312,7 +741,11 @@ def build_documents_from_form(request):
         "[Student Clubs, Volunteer Work, Independent Activities]":activities,
         "[Keep this to 1-2 lines and be specific; do not go overboard]":interests,
     }
-    replace_in_doc_preserve(cv_doc, cv_map)
+
+    # experience blocks are cloned first, then one replacement pass covers the
+    # whole document (experience paragraphs get cv_map overlaid with their entry)
+    exp_overrides = materialize_experiences(cv_doc, experiences, cv_map)
+    replace_in_doc_preserve(cv_doc, _CV_AC, cv_map, exp_overrides)
 
     fname = sanitize_filename(first_name or "Firstname")
     lname = sanitize_filename(last_name or "Surname")
@@ -321,7 +754,6 @@ def build_documents_from_form(request):
     cv_doc.save(cv_docx_path)
 
     # ---------- Cover Letter ----------
-    cl_doc = Document(os.path.join(DOCX_TPL_DIR, "Cover_letter_template.docx"))
     cl_map = {
         "[Your Name]": full_name or "",
         "[Your Address]": physical_address or "",            # ensure mapped
@@ -364,42 +796,21 @@ def build_documents_from_form(request):
         "[Your Name]": full_name or "",
         "[Signature]": signature or "",
     }
-    replace_in_doc_preserve(cl_doc, cl_map)
 
     cl_docx_path = os.path.join(GENERATED_DIR, f"{fname}_{lname}_CoverLetter.docx")
     cl_pdf_path  = os.path.join(GENERATED_DIR, f"{fname}_{lname}_CoverLetter.pdf")
-    cl_doc.save(cl_docx_path)
-
-    # optional PDF export
-    def try_docx2pdf(input_docx: str, output_pdf: str) -> bool:
-        try:
-            from docx2pdf import convert
-            convert(input_docx, output_pdf)
-            return os.path.exists(output_pdf)
-        except Exception:
-            return False
-
-    def try_libreoffice(input_docx: str, output_pdf: str) -> bool:
-        try:
-            outdir = os.path.dirname(output_pdf)
-            os.makedirs(outdir, exist_ok=True)
-            subprocess.run(
-                ["soffice", "--headless", "--convert-to", "pdf", "--outdir", outdir, input_docx],
-                check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE
-            )
-            return os.path.exists(output_pdf)
-        except Exception:
-            return False
+    # no structural edits in the cover letter: fill document.xml straight from the zip
+    fill_docx_template(_CL_TPL_BYTES, _CL_AC, cl_map, cl_docx_path)
 
-    cv_ok = try_docx2pdf(cv_docx_path, cv_pdf_path) or try_libreoffice(cv_docx_path, cv_pdf_path)
-    cl_ok = try_docx2pdf(cl_docx_path, cl_pdf_path) or try_libreoffice(cl_docx_path, cl_pdf_path)
+    # optional PDF export, off the request path (poll /pdfstatus/<filename>)
+    enqueue_pdf(cv_docx_path, cv_pdf_path)
+    enqueue_pdf(cl_docx_path, cl_pdf_path)
 
     return {
         "cv_docx": os.path.basename(cv_docx_path),
         "cl_docx": os.path.basename(cl_docx_path),
-        "cv_pdf": os.path.basename(cv_pdf_path) if cv_ok else None,
-        "cl_pdf": os.path.basename(cl_pdf_path) if cl_ok else None,
-        "pdf_ok": cv_ok and cl_ok
+        "cv_pdf": os.path.basename(cv_pdf_path),
+        "cl_pdf": os.path.basename(cl_pdf_path),
     }
 
 # ----------------- routes -----------------
@@ -410,10 +821,8 @@ def index():
 @app.route("/generate", methods=["POST"])
 def generate():
     # Header
+    # PDFs convert in the background; success.html polls /pdfstatus and reports failures
     result=build_documents_from_form(request)
-    if result.get('pdf_ok'):
-        flash("PDF export failed (DOCX generated). Install Word (docx2pdf) or LibreOffice (soffice) for PDF.", "warning")
-
     return render_template(
         "success.html",
         cv_pdf = result.get('cv_pdf'),
@@ -431,7 +840,6 @@ def preview():
         cl_pdf=result.get("cl_pdf"),
         cv_docx=result.get("cv_docx"),
         cl_docx=result.get("cl_docx"),
-        pdf_ok=result.get("pdf_ok", False),
     )
 
 @app.route("/download/<path:filename>")
@@ -442,6 +850,16 @@ def download(filename):
 def pdfshow(filename):
     return send_from_directory(GENERATED_DIR, filename, as_attachment=False)
 
+@app.route("/pdfstatus/<path:filename>")
+def pdfstatus(filename):
+    pdf_path = safe_join(GENERATED_DIR, filename)
+    if pdf_path is None:  # escapes GENERATED_DIR
+        abort(404)
+    return jsonify(
+        ready=os.path.exists(pdf_path),
+        failed=os.path.exists(_pdf_failed_marker(pdf_path)),
+    )
+
 @app.route("/health")
 def health():
     return {"status": "ok"}
@@ -0,0 +1,14 @@
+// PDFs are converted in the background: poll /pdfstatus until one is ready or failed.
+// Give up after ~2 minutes (e.g. the job was lost to a server restart).
+const PDF_POLL_LIMIT = 120;
+
+function pollPdfStatus(statusUrl, onReady, onFailed) {
+  let attempts = 0;
+  const retry = () => (++attempts >= PDF_POLL_LIMIT ? onFailed() : setTimeout(poll, 1000));
+  const poll = () => fetch(statusUrl).then(r => r.json()).then(s => {
+    if (s.ready) onReady();
+    else if (s.failed) onFailed();
+    else retry();
+  }).catch(retry);  // transient fetch/parse errors count towards the limit
+  poll();
+}